@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class Specialty(BaseModel):
+    id: str
+    name: str
+    color: str
+    duration: int = 30       # minutes (multiple of 15)
+    priority: int = 0        # lower = higher priority
+    auto_schedule: bool = True
+
+class SpecialtyReorderItem(BaseModel):
+    id: str
+    priority: int
+
+class ScheduleSlot(BaseModel):
+    patient_name: str
+    time_slot: str
+    specialty_id: str
+    pinned: bool = False
+
+class Patient(BaseModel):
+    name: str
+    arrival_time: str
+
+class Schedule(BaseModel):
+    id: str
+    name: str
+    slots: List[ScheduleSlot]
+    patients: Optional[List[Patient]] = None
+    created_at: str
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from models import Schedule
+from storage import cached_json_response, delete_item, load_data, update_items
+
+router = APIRouter(prefix="/api/schedules", tags=["schedules"])
+
+@router.get("")
+async def get_schedules(request: Request):
+    schedules = await load_data("schedules")
+    return cached_json_response(request, "schedules", schedules)
+
+@router.post("", response_model=Schedule)
+async def create_schedule(schedule: Schedule):
+    def append(schedules):
+        if schedule.id in schedules:
+            raise HTTPException(status_code=409, detail="Schedule already exists")
+        return [schedule.dict()]
+
+    await update_items("schedules", append)
+    return schedule
+
+# Reads return stored items as-is: they were validated when written, so no
+# response_model re-validation on the way out.
+@router.get("/{schedule_id}")
+async def get_schedule(schedule_id: str):
+    schedules = await load_data("schedules")
+    if schedule_id not in schedules:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return ORJSONResponse(content=schedules[schedule_id])
+
+@router.delete("/{schedule_id}")
+async def delete_schedule(schedule_id: str):
+    await delete_item("schedules", schedule_id)
+    return {"message": "Schedule deleted"}
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import asyncio
+import multiprocessing
+from solver import (
+    SolveRequest,
+    SolveResponse,
+    cache_solution,
+    get_cached_solution,
+    request_digest,
+    solve_schedule,
+    solver_pool_size,
+)
+
+router = APIRouter(prefix="/api", tags=["solver"])
+
+# CP-SAT solves run in worker processes so a long solve never blocks the
+# event loop or competes for the GIL. Created on startup, see app.py.
+# Workers are spawned rather than forked, so they can't inherit locks held
+# by the event loop or aiosqlite threads of this process.
+SOLVER_POOL: Optional[ProcessPoolExecutor] = None
+
+def start_solver_pool():
+    global SOLVER_POOL
+    SOLVER_POOL = ProcessPoolExecutor(
+        max_workers=solver_pool_size(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+def _replace_broken_pool(broken: ProcessPoolExecutor):
+    """Swap in a fresh pool after a worker died, unless another request already did."""
+    if SOLVER_POOL is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        start_solver_pool()
+
+def shutdown_solver_pool():
+    global SOLVER_POOL
+    if SOLVER_POOL is not None:
+        SOLVER_POOL.shutdown(cancel_futures=True)
+        SOLVER_POOL = None
+
+@router.post("/solve", response_model=SolveResponse)
+async def solve(request: SolveRequest):
+    # Repeated requests are answered from this process's memo without a
+    # round trip to the pool.
+    digest = request_digest(request)
+    cached = get_cached_solution(digest)
+    if cached is not None:
+        return cached
+
+    # A worker that died (e.g. an OR-Tools abort or an OOM kill) breaks the
+    # whole pool; replace it and retry once before giving up.
+    loop = asyncio.get_running_loop()
+    for _ in range(2):
+        pool = SOLVER_POOL
+        try:
+            response = await loop.run_in_executor(pool, solve_schedule, request)
+            break
+        except BrokenProcessPool:
+            _replace_broken_pool(pool)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Solver error: {str(e)}")
+    else:
+        raise HTTPException(status_code=503, detail="Solver worker crashed, please try again.")
+
+    cache_solution(digest, response)
+    return response
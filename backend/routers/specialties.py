@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Request
+from typing import List
+from models import Specialty, SpecialtyReorderItem
+from storage import cached_json_response, delete_item, load_data, update_items
+
+router = APIRouter(prefix="/api/specialties", tags=["specialties"])
+
+@router.get("")
+async def get_specialties(request: Request):
+    specialties = await load_data("specialties")
+    return cached_json_response(request, "specialties", specialties,
+                                sort_key=lambda s: s.get("priority", 0))
+
+@router.post("", response_model=Specialty)
+async def create_specialty(specialty: Specialty):
+    def append(specialties):
+        if specialty.id in specialties:
+            raise HTTPException(status_code=409, detail="Specialty already exists")
+        max_priority = max((s.get("priority", 0) for s in specialties.values()), default=-1)
+        spec_dict = specialty.dict()
+        spec_dict["priority"] = max_priority + 1
+        return [spec_dict]
+
+    [spec_dict] = await update_items("specialties", append)
+    return Specialty(**spec_dict)
+
+@router.put("/reorder")
+async def reorder_specialties(items: List[SpecialtyReorderItem]):
+    await update_items("specialties", lambda specialties: [
+        {**specialties[item.id], "priority": item.priority}
+        for item in items
+        if item.id in specialties
+    ])
+    return {"message": "Specialties reordered"}
+
+@router.put("/{specialty_id}", response_model=Specialty)
+async def update_specialty(specialty_id: str, specialty: Specialty):
+    def replace(specialties):
+        if specialty_id not in specialties:
+            raise HTTPException(status_code=404, detail="Specialty not found")
+        updated = specialty.dict()
+        updated["id"] = specialty_id
+        return [updated]
+
+    [updated] = await update_items("specialties", replace)
+    return Specialty(**updated)
+
+@router.delete("/{specialty_id}")
+async def delete_specialty(specialty_id: str):
+    await delete_item("specialties", specialty_id)
+    return {"message": "Specialty deleted"}
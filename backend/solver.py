@@ -6,8 +6,13 @@ specialties to patient time slots, respecting hard constraints and
 minimizing idle time / priority violations.
 """
 
+import hashlib
+import os
+import threading
 import time
-from typing import List, Dict
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Optional
+import orjson
 from pydantic import BaseModel
 from ortools.sat.python import cp_model
 
@@ -49,6 +54,8 @@ class SolveRequest(BaseModel):
     ]
 
 
+# The solver builds these with model_construct: every field comes from the
+# already-validated request or from solver values, so validation is skipped.
 class SolveResultSlot(BaseModel):
     patient_name: str
     time_slot: str
@@ -67,28 +74,114 @@ class SolveResponse(BaseModel):
 # Time-slot helpers
 # ---------------------------------------------------------------------------
 
-def time_to_index(time_str: str, time_slots: List[str]) -> int:
-    """Convert a time string like '8:00' to its slot index."""
-    return time_slots.index(time_str)
+def build_slot_index(time_slots: List[str]) -> Dict[str, int]:
+    """Map each time string like '8:00' to its slot index.
 
+    Slot indices map back to time strings by indexing `time_slots` directly.
+    """
+    return {t: i for i, t in enumerate(time_slots)}
 
-def index_to_time(idx: int, time_slots: List[str]) -> str:
-    """Convert a slot index back to its time string."""
-    return time_slots[idx]
+
+def slot_index(slot_to_idx: Dict[str, int], time_str: str) -> int:
+    """Look up `time_str` in a `build_slot_index` map.
+
+    Raises ValueError for a time that is not one of the request's slots, so
+    the API reports it as a bad request.
+    """
+    try:
+        return slot_to_idx[time_str]
+    except KeyError:
+        raise ValueError(f"Unknown time slot {time_str!r}") from None
+
+
+# ---------------------------------------------------------------------------
+# CPU budget
+# ---------------------------------------------------------------------------
+
+def available_cpus() -> int:
+    """CPUs this process may run on.
+
+    Uses the scheduler affinity where the platform has it, which follows a
+    container's cpuset; os.cpu_count() reports all of the host's cores.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def solver_pool_size() -> int:
+    """Number of concurrent solves: one per 8 available CPUs, at least one."""
+    return max(1, available_cpus() // 8)
+
+
+def solver_threads() -> int:
+    """CP-SAT workers per solve, so that a full pool uses at most the available CPUs."""
+    return min(max(1, available_cpus() // solver_pool_size()), 16)
+
+
+# ---------------------------------------------------------------------------
+# Solution memoization
+# ---------------------------------------------------------------------------
+
+# The memo lives in the API process (routers/solver.py), which checks it
+# before handing a request to the solver pool; solve_schedule always solves.
+SOLVE_CACHE_SIZE = 128
+
+# Only proven outcomes are reused; a FEASIBLE result that hit the time limit
+# may improve when solved again.
+_CACHEABLE_STATUSES = {"OPTIMAL", "INFEASIBLE"}
+
+_solve_cache: "OrderedDict[str, SolveResponse]" = OrderedDict()
+_solve_cache_lock = threading.Lock()
+
+
+def request_digest(request: SolveRequest) -> str:
+    """Content hash of a solve request, used as the memoization key."""
+    payload = orjson.dumps(request.model_dump(), option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def get_cached_solution(digest: str) -> Optional[SolveResponse]:
+    """Return the memoized response for a request digest, if any."""
+    with _solve_cache_lock:
+        cached = _solve_cache.get(digest)
+        if cached is not None:
+            _solve_cache.move_to_end(digest)
+        return cached
+
+
+def cache_solution(digest: str, response: SolveResponse) -> None:
+    """Memoize `response` under `digest` if its status is a proven outcome."""
+    if response.status not in _CACHEABLE_STATUSES:
+        return
+    with _solve_cache_lock:
+        _solve_cache[digest] = response
+        while len(_solve_cache) > SOLVE_CACHE_SIZE:
+            _solve_cache.popitem(last=False)
 
 
 # ---------------------------------------------------------------------------
 # Main solver
 # ---------------------------------------------------------------------------
 
+# Objective weights
+WEIGHT_SPAN = 100
+WEIGHT_PRIORITY = 3
+WEIGHT_MAKESPAN = 1
+
+
 def solve_schedule(request: SolveRequest) -> SolveResponse:
     """Build and solve the CP-SAT model, returning optimized schedule slots."""
     start_time = time.time()
 
     time_slots = request.time_slots
+    slot_to_idx = build_slot_index(time_slots)
     horizon = len(time_slots)
     patients = request.patients
     all_specialties = {s.id: s for s in request.specialties}
+    for spec in request.specialties:
+        if spec.duration < 0:
+            raise ValueError(f"{spec.name} has a negative duration ({spec.duration} minutes).")
 
     # Separate auto vs non-auto specialties
     auto_specs = sorted(
@@ -104,21 +197,104 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
     if num_patients == 0 or num_specs == 0:
         pinned_result = _pinned_slots_to_result(request.pinned_slots)
         elapsed = int((time.time() - start_time) * 1000)
-        return SolveResponse(status="OPTIMAL", slots=pinned_result, solve_time_ms=elapsed)
+        return SolveResponse.model_construct(status="OPTIMAL", slots=pinned_result, solve_time_ms=elapsed)
 
     # Build index lookups
     patient_idx: Dict[str, int] = {p.name: i for i, p in enumerate(patients)}
+    # Names need not be unique (new patients start out unnamed); an auto pin
+    # applies to every patient with its name
+    patients_by_name: Dict[str, List[int]] = defaultdict(list)
+    for i, p in enumerate(patients):
+        patients_by_name[p.name].append(i)
     spec_idx: Dict[str, int] = {s.id: i for i, s in enumerate(auto_specs)}
 
-    # Organize pinned slots
-    pinned_auto: Dict[tuple, PinnedSlot] = {}      # (patient_name, spec_id) -> slot
-    pinned_non_auto: List[PinnedSlot] = []
+    # Organize pinned slots (non-auto wins if an id is somehow both)
+    auto_spec_ids = spec_idx.keys() - non_auto_spec_ids
+    pinned_auto: Dict[tuple, PinnedSlot] = {       # (patient_name, spec_id) -> slot
+        (ps.patient_name, ps.specialty_id): ps
+        for ps in request.pinned_slots
+        if ps.specialty_id in auto_spec_ids
+    }
+    pinned_non_auto: List[PinnedSlot] = [
+        ps for ps in request.pinned_slots if ps.specialty_id in non_auto_spec_ids
+    ]
 
-    for ps in request.pinned_slots:
-        if ps.specialty_id in non_auto_spec_ids:
-            pinned_non_auto.append(ps)
-        elif ps.specialty_id in spec_idx:
-            pinned_auto[(ps.patient_name, ps.specialty_id)] = ps
+    # Durations in 15-minute slots, by auto spec index and by spec id
+    dur_slots: List[int] = [spec.duration // 15 for spec in auto_specs]
+    all_dur_slots: Dict[str, int] = {sid: sp.duration // 15 for sid, sp in all_specialties.items()}
+
+    # Per-patient arrival slot and per-(patient, spec) pinned start slot
+    arrival_idx: List[int] = [slot_index(slot_to_idx, pt.arrival_time) for pt in patients]
+    pin_idx_grid: List[List[Optional[int]]] = [[None] * num_specs for _ in range(num_patients)]
+    for (p_name, spec_id), ps in pinned_auto.items():
+        if p_name in patients_by_name:
+            pin = slot_index(slot_to_idx, ps.time_slot)
+            for p in patients_by_name[p_name]:
+                pin_idx_grid[p][spec_idx[spec_id]] = pin
+
+    # Non-auto pinned slots that belong to a known patient, with their
+    # (patient, start, dur_slots)
+    non_auto_pins: List[PinnedSlot] = [ps for ps in pinned_non_auto if ps.patient_name in patient_idx]
+    non_auto_busy: List[tuple] = [
+        (patient_idx[ps.patient_name], slot_index(slot_to_idx, ps.time_slot),
+         all_dur_slots.get(ps.specialty_id, 2))  # default 30 min
+        for ps in non_auto_pins
+    ]
+
+    # Skip the model entirely when a cheap counting argument already rules
+    # out every schedule
+    reason = _infeasibility_reason(
+        [pt.name for pt in patients], [spec.name for spec in auto_specs],
+        arrival_idx, dur_slots, pin_idx_grid, non_auto_busy, horizon,
+    )
+    if reason is not None:
+        elapsed = int((time.time() - start_time) * 1000)
+        return SolveResponse.model_construct(
+            status="INFEASIBLE",
+            slots=[],
+            solve_time_ms=elapsed,
+            message=f"No feasible schedule exists: {reason}",
+        )
+
+    # (earlier, later) spec pairs between consecutive priority levels only.
+    # Going through the intermediate levels ties distant levels together, so
+    # this keeps the ordering pressure with O(S) pairs per patient instead of
+    # O(S^2). auto_specs is sorted by priority, so the levels are contiguous.
+    priority_levels: List[List[int]] = []
+    for s in range(num_specs):
+        if priority_levels and auto_specs[priority_levels[-1][0]].priority == auto_specs[s].priority:
+            priority_levels[-1].append(s)
+        else:
+            priority_levels.append([s])
+    priority_pairs = [
+        (s1, s2)
+        for level, next_level in zip(priority_levels, priority_levels[1:])
+        for s1 in level
+        for s2 in next_level
+    ]
+
+    # Earliest-fit assignment, used as the solver hint
+    greedy = _greedy_starts(
+        arrival_idx,
+        dur_slots,
+        pin_idx_grid,
+        non_auto_busy,
+        horizon,
+    )
+
+    # Skip the model when the greedy schedule meets the objective's lower
+    # bound, so it is already optimal
+    greedy_objective = _greedy_objective_if_optimal(
+        greedy, arrival_idx, dur_slots, pin_idx_grid, non_auto_busy, priority_pairs, horizon,
+    )
+    if greedy_objective is not None:
+        elapsed = int((time.time() - start_time) * 1000)
+        return SolveResponse.model_construct(
+            status="OPTIMAL",
+            slots=_result_slots(patients, auto_specs, time_slots, greedy, pin_idx_grid, pinned_non_auto),
+            solve_time_ms=elapsed,
+            message=f"Solved in {elapsed}ms with objective value {greedy_objective}",
+        )
 
     # -----------------------------------------------------------------------
     # Build CP-SAT model
@@ -126,62 +302,56 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
     model = cp_model.CpModel()
 
     # Decision variables: one interval per (patient, auto_specialty)
-    # spec_vars[p][s] = (start, end, interval)
-    spec_vars = [[None] * num_specs for _ in range(num_patients)]
-
+    # starts[p][s], ends[p][s], intervals[p][s]
+    starts = [[None] * num_specs for _ in range(num_patients)]
+    ends = [[None] * num_specs for _ in range(num_patients)]
+    intervals = [[None] * num_specs for _ in range(num_patients)]
+
+    # Arrival and pin constraints are the start domains: [arrival, horizon -
+    # dur], or just the pinned slot. _infeasibility_reason has checked that
+    # neither is empty.
     for p in range(num_patients):
-        p_name = patients[p].name
-        arrival_idx = time_to_index(patients[p].arrival_time, time_slots)
-
         for s in range(num_specs):
-            spec = auto_specs[s]
-            dur_slots = spec.duration // 15  # 15-min resolution
-
-            start = model.NewIntVar(0, horizon - dur_slots, f"s_{p}_{s}")
-            end = model.NewIntVar(dur_slots, horizon, f"e_{p}_{s}")
-            interval = model.NewFixedSizeIntervalVar(start, dur_slots, f"i_{p}_{s}")
-            model.Add(end == start + dur_slots)
-
-            # Arrival constraint
-            model.Add(start >= arrival_idx)
+            dur = dur_slots[s]
+            if (pin_idx := pin_idx_grid[p][s]) is not None:
+                earliest, latest = pin_idx, pin_idx
+            else:
+                earliest, latest = arrival_idx[p], horizon - dur
 
-            # Pin constraint
-            pin_key = (p_name, spec.id)
-            if pin_key in pinned_auto:
-                pin_idx = time_to_index(pinned_auto[pin_key].time_slot, time_slots)
-                model.Add(start == pin_idx)
+            start = model.NewIntVar(earliest, latest, f"s_{p}_{s}")
+            end = model.NewIntVar(earliest + dur, latest + dur, f"e_{p}_{s}")
+            interval = model.NewFixedSizeIntervalVar(start, dur, f"i_{p}_{s}")
+            model.Add(end == start + dur)
 
-            spec_vars[p][s] = (start, end, interval)
+            starts[p][s] = start
+            ends[p][s] = end
+            intervals[p][s] = interval
 
     # Non-auto pinned intervals (for no-overlap constraints)
-    non_auto_intervals_by_patient: Dict[int, list] = {i: [] for i in range(num_patients)}
-    non_auto_intervals_by_spec: Dict[str, list] = {}
-
-    for ps in pinned_non_auto:
-        if ps.patient_name not in patient_idx:
-            continue
-        p = patient_idx[ps.patient_name]
-        slot_idx = time_to_index(ps.time_slot, time_slots)
-
-        spec = all_specialties.get(ps.specialty_id)
-        dur_slots = (spec.duration // 15) if spec else 2  # default 30 min
+    non_auto_intervals_by_patient: List[list] = [[] for _ in range(num_patients)]
+    non_auto_intervals_by_spec: Dict[str, list] = defaultdict(list)
 
+    for ps, (p, slot_idx, dur) in zip(non_auto_pins, non_auto_busy):
         name = f"na_{p}_{ps.specialty_id}_{ps.time_slot}"
-        interval = model.NewFixedSizeIntervalVar(slot_idx, dur_slots, name)
+        interval = model.NewFixedSizeIntervalVar(slot_idx, dur, name)
         non_auto_intervals_by_patient[p].append(interval)
 
-        if ps.specialty_id not in non_auto_intervals_by_spec:
-            non_auto_intervals_by_spec[ps.specialty_id] = []
         non_auto_intervals_by_spec[ps.specialty_id].append(interval)
 
+    for p in range(num_patients):
+        for s in range(num_specs):
+            if greedy[p][s] is not None:
+                model.AddHint(starts[p][s], greedy[p][s])
+                model.AddHint(ends[p][s], greedy[p][s] + dur_slots[s])
+
+    # Auto intervals per spec (columns of `intervals`)
+    intervals_by_spec = [[row[s] for row in intervals] for s in range(num_specs)]
+
     # -----------------------------------------------------------------------
     # Hard constraint 1: Patient no-overlap
     # -----------------------------------------------------------------------
     for p in range(num_patients):
-        patient_intervals = [spec_vars[p][s][2] for s in range(num_specs)]
-        patient_intervals.extend(non_auto_intervals_by_patient.get(p, []))
-        if patient_intervals:
-            model.AddNoOverlap(patient_intervals)
+        model.AddNoOverlap(intervals[p] + non_auto_intervals_by_patient[p])
 
     # -----------------------------------------------------------------------
     # Hard constraint 2: Specialty no-overlap (across patients)
@@ -189,9 +359,8 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
     # -----------------------------------------------------------------------
     for s in range(num_specs):
         spec_id = auto_specs[s].id
-        spec_intervals = [spec_vars[p][s][2] for p in range(num_patients)]
         # Add non-auto pinned intervals for same specialty
-        spec_intervals.extend(non_auto_intervals_by_spec.get(spec_id, []))
+        spec_intervals = intervals_by_spec[s] + non_auto_intervals_by_spec.get(spec_id, [])
         if len(spec_intervals) > 1:
             model.AddNoOverlap(spec_intervals)
 
@@ -199,37 +368,65 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
     # Hard constraint 3: First specialty starts at patient arrival time
     # -----------------------------------------------------------------------
     for p in range(num_patients):
-        arrival_idx = time_to_index(patients[p].arrival_time, time_slots)
         starts_at_arrival = []
         for s in range(num_specs):
             b = model.NewBoolVar(f"at_arr_{p}_{s}")
-            model.Add(spec_vars[p][s][0] == arrival_idx).OnlyEnforceIf(b)
+            # b <=> (start == arrival), so propagation works both ways
+            model.Add(starts[p][s] == arrival_idx[p]).OnlyEnforceIf(b)
+            model.Add(starts[p][s] != arrival_idx[p]).OnlyEnforceIf(b.Not())
+            if greedy[p][s] is not None:
+                model.AddHint(b, greedy[p][s] == arrival_idx[p])
             starts_at_arrival.append(b)
         if starts_at_arrival:
-            model.AddBoolOr(starts_at_arrival)
+            model.AddAtLeastOne(starts_at_arrival)
 
     # -----------------------------------------------------------------------
-    # Soft objective 1: Minimize total patient span
+    # Symmetry breaking: interchangeable patients
+    # Patients with the same arrival and no pinned slots are interchangeable,
+    # so any schedule can be relabelled to start them on the first auto spec
+    # in patient order. Ordering those starts removes the k! equivalent
+    # permutations of each group of k such patients.
     # -----------------------------------------------------------------------
-    WEIGHT_SPAN = 100
-    WEIGHT_PRIORITY = 3
-    WEIGHT_MAKESPAN = 1
+    interchangeable: Dict[int, List[int]] = {}
+    for p in range(num_patients):
+        if non_auto_intervals_by_patient[p] or any(pin is not None for pin in pin_idx_grid[p]):
+            continue
+        interchangeable.setdefault(arrival_idx[p], []).append(p)
+
+    for group in interchangeable.values():
+        for p1, p2 in zip(group, group[1:]):
+            model.Add(starts[p1][0] <= starts[p2][0])
 
+    # -----------------------------------------------------------------------
+    # Search strategy: branch on the most constrained start and try its
+    # earliest slot first. The default portfolio's fixed-search worker
+    # follows it; the other workers keep their own heuristics.
+    # -----------------------------------------------------------------------
+    model.AddDecisionStrategy(
+        [start for row in starts for start in row],
+        cp_model.CHOOSE_MIN_DOMAIN_SIZE,
+        cp_model.SELECT_MIN_VALUE,
+    )
+
+    # -----------------------------------------------------------------------
+    # Soft objective 1: Minimize total patient span
+    # -----------------------------------------------------------------------
     patient_spans = []
     patient_max_ends = []
+    total_dur = sum(dur_slots)
 
     for p in range(num_patients):
-        all_starts = [spec_vars[p][s][0] for s in range(num_specs)]
-        all_ends = [spec_vars[p][s][1] for s in range(num_specs)]
-
-        min_start = model.NewIntVar(0, horizon, f"min_s_{p}")
-        max_end = model.NewIntVar(0, horizon, f"max_e_{p}")
-
-        model.AddMinEquality(min_start, all_starts)
-        model.AddMaxEquality(max_end, all_ends)
-
-        span = model.NewIntVar(0, horizon, f"span_{p}")
-        model.Add(span == max_end - min_start)
+        # Every start is >= arrival and one start equals it (constraint 3),
+        # so the earliest start is the arrival slot itself. The latest end
+        # only needs a lower bound: span and makespan are minimized, which
+        # pulls max_end down onto the true maximum. The auto specs don't
+        # overlap, so the span is at least their total duration.
+        max_end = model.NewIntVar(arrival_idx[p] + total_dur, horizon, f"max_e_{p}")
+        for end in ends[p]:
+            model.Add(max_end >= end)
+
+        span = model.NewIntVar(total_dur, horizon - arrival_idx[p], f"span_{p}")
+        model.Add(span == max_end - arrival_idx[p])
         patient_spans.append(span)
         patient_max_ends.append(max_end)
 
@@ -237,57 +434,53 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
     # Soft objective 2: Minimize priority violations (proportional)
     # -----------------------------------------------------------------------
     priority_costs = []
+    fixed_priority_cost = 0  # delays between two pinned starts are constants
 
     for p in range(num_patients):
-        for s1 in range(num_specs):
-            for s2 in range(s1 + 1, num_specs):
-                prio1 = auto_specs[s1].priority
-                prio2 = auto_specs[s2].priority
-                if prio1 == prio2:
-                    continue
-
-                if prio1 < prio2:
-                    earlier_s, later_s = s1, s2
-                else:
-                    earlier_s, later_s = s2, s1
-
-                delay = model.NewIntVar(0, horizon, f"pd_{p}_{earlier_s}_{later_s}")
-                model.Add(delay >= spec_vars[p][earlier_s][0] - spec_vars[p][later_s][0])
-                priority_costs.append(delay)
+        pins = pin_idx_grid[p]
+        for earlier_s, later_s in priority_pairs:
+            if pins[earlier_s] is not None and pins[later_s] is not None:
+                fixed_priority_cost += max(0, pins[earlier_s] - pins[later_s])
+                continue
+            delay = model.NewIntVar(0, horizon, f"pd_{p}_{earlier_s}_{later_s}")
+            model.Add(delay >= starts[p][earlier_s] - starts[p][later_s])
+            priority_costs.append(delay)
 
     # -----------------------------------------------------------------------
     # Soft objective 3: Minimize makespan
     # -----------------------------------------------------------------------
-    makespan = model.NewIntVar(0, horizon, "makespan")
+    makespan = model.NewIntVar(max(arrival_idx) + total_dur, horizon, "makespan")
     for max_end in patient_max_ends:
         model.Add(makespan >= max_end)
-    if not patient_max_ends:
-        model.Add(makespan == 0)
 
     # -----------------------------------------------------------------------
     # Combined objective
     # -----------------------------------------------------------------------
-    objective_terms = []
-    for span in patient_spans:
-        objective_terms.append(WEIGHT_SPAN * span)
-    for pc in priority_costs:
-        objective_terms.append(WEIGHT_PRIORITY * pc)
-    objective_terms.append(WEIGHT_MAKESPAN * makespan)
-
-    model.Minimize(sum(objective_terms))
+    # One flat weighted sum instead of a chain of Python-side additions
+    objective_vars = patient_spans + priority_costs + [makespan]
+    objective_coeffs = (
+        [WEIGHT_SPAN] * len(patient_spans)
+        + [WEIGHT_PRIORITY] * len(priority_costs)
+        + [WEIGHT_MAKESPAN]
+    )
+    model.Minimize(
+        cp_model.LinearExpr.WeightedSum(objective_vars, objective_coeffs)
+        + WEIGHT_PRIORITY * fixed_priority_cost
+    )
 
     # -----------------------------------------------------------------------
     # Solve
     # -----------------------------------------------------------------------
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = 30.0
-    solver.parameters.num_workers = 8
+    solver.parameters.num_workers = solver_threads()
+    solver.parameters.linearization_level = 0
 
     status = solver.Solve(model)
     elapsed = int((time.time() - start_time) * 1000)
 
     if status == cp_model.INFEASIBLE:
-        return SolveResponse(
+        return SolveResponse.model_construct(
             status="INFEASIBLE",
             slots=[],
             solve_time_ms=elapsed,
@@ -295,7 +488,7 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
         )
 
     if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        return SolveResponse(
+        return SolveResponse.model_construct(
             status="ERROR",
             slots=[],
             solve_time_ms=elapsed,
@@ -305,47 +498,215 @@ def solve_schedule(request: SolveRequest) -> SolveResponse:
     # -----------------------------------------------------------------------
     # Extract solution
     # -----------------------------------------------------------------------
-    result_slots: List[SolveResultSlot] = []
+    result_slots = _result_slots(
+        patients, auto_specs, time_slots,
+        [[solver.Value(start) for start in row] for row in starts],
+        pin_idx_grid, pinned_non_auto,
+    )
+
+    status_str = "OPTIMAL" if status == cp_model.OPTIMAL else "FEASIBLE"
+    return SolveResponse.model_construct(
+        status=status_str,
+        slots=result_slots,
+        solve_time_ms=elapsed,
+        message=f"Solved in {elapsed}ms with objective value {solver.ObjectiveValue():.0f}",
+    )
+
+
+def _infeasibility_reason(
+    patient_names: List[str],
+    spec_names: List[str],
+    arrival_idx: List[int],
+    dur_slots: List[int],
+    pin_idx_grid: List[List[Optional[int]]],
+    fixed_busy: List[tuple],
+    horizon: int,
+) -> Optional[str]:
+    """Return why no schedule can exist, or None if these checks pass.
+
+    Only necessary conditions are checked, so None does not imply the
+    request is feasible:
+      - every pinned auto slot lies within [arrival, horizon];
+      - each patient's auto specs fit in the slots after arrival left free
+        by their `fixed_busy` (patient, start, dur_slots) intervals;
+      - each auto spec can see every patient between the earliest arrival
+        and the end of the day.
+    """
+    num_patients = len(arrival_idx)
+    num_specs = len(dur_slots)
+    total_dur = sum(dur_slots)
+
+    busy_by_patient: List[set] = [set() for _ in range(num_patients)]
+    for p, start, dur in fixed_busy:
+        busy_by_patient[p].update(range(start, min(start + dur, horizon)))
 
     for p in range(num_patients):
-        p_name = patients[p].name
         for s in range(num_specs):
-            spec = auto_specs[s]
-            start_idx = solver.Value(spec_vars[p][s][0])
-            time_str = index_to_time(start_idx, time_slots)
+            pin = pin_idx_grid[p][s]
+            if pin is not None and not arrival_idx[p] <= pin <= horizon - dur_slots[s]:
+                return (f"{patient_names[p]}'s pinned {spec_names[s]} slot is "
+                        f"before arrival or past the end of the day.")
+        free = horizon - arrival_idx[p] - sum(1 for t in busy_by_patient[p] if t >= arrival_idx[p])
+        if total_dur > free:
+            return f"{patient_names[p]}'s specialties don't fit between arrival and the end of the day."
+
+    earliest = min(arrival_idx)
+    for s in range(num_specs):
+        if num_patients * dur_slots[s] > horizon - earliest:
+            return f"{spec_names[s]} cannot see all {num_patients} patients in one day."
+
+    return None
+
+
+def _greedy_starts(
+    arrival_idx: List[int],
+    dur_slots: List[int],
+    pin_idx_grid: List[List[Optional[int]]],
+    fixed_busy: List[tuple],
+    horizon: int,
+) -> List[List[Optional[int]]]:
+    """Earliest-fit start slot per (patient, spec), used as a solver hint.
+
+    Pinned starts and `fixed_busy` (patient, start, dur_slots) intervals are
+    reserved first; patients are then placed in arrival order, specs in
+    priority order, at the first slot where both are free. Cells that fit
+    nowhere stay None. The result is not guaranteed to be feasible.
+    """
+    num_patients = len(arrival_idx)
+    num_specs = len(dur_slots)
+    # Busy slots as int bitmasks (bit t set = slot t taken), so a fit test is
+    # one AND instead of a scan over the window.
+    patient_busy = [0] * num_patients
+    spec_busy = [0] * num_specs
+    starts: List[List[Optional[int]]] = [[None] * num_specs for _ in range(num_patients)]
+    full = (1 << horizon) - 1
+    window = [(1 << dur) - 1 for dur in dur_slots]
+
+    for p, start, dur in fixed_busy:
+        patient_busy[p] |= (((1 << dur) - 1) << start) & full
 
-            is_pinned = (p_name, spec.id) in pinned_auto
-            result_slots.append(SolveResultSlot(
+    for p in range(num_patients):
+        for s in range(num_specs):
+            pin = pin_idx_grid[p][s]
+            if pin is not None:
+                starts[p][s] = pin
+                mask = (window[s] << pin) & full
+                patient_busy[p] |= mask
+                spec_busy[s] |= mask
+
+    for p in sorted(range(num_patients), key=lambda p: arrival_idx[p]):
+        for s in range(num_specs):
+            if starts[p][s] is not None:
+                continue
+            busy = patient_busy[p] | spec_busy[s]
+            for t in range(arrival_idx[p], horizon - dur_slots[s] + 1):
+                mask = window[s] << t
+                if not busy & mask:
+                    starts[p][s] = t
+                    patient_busy[p] |= mask
+                    spec_busy[s] |= mask
+                    break
+
+    return starts
+
+
+def _greedy_objective_if_optimal(
+    greedy: List[List[Optional[int]]],
+    arrival_idx: List[int],
+    dur_slots: List[int],
+    pin_idx_grid: List[List[Optional[int]]],
+    fixed_busy: List[tuple],
+    priority_pairs: List[tuple],
+    horizon: int,
+) -> Optional[int]:
+    """Objective value of the `greedy` starts if they are provably optimal, else None.
+
+    Every patient's span is at least the total auto duration, and the only
+    unavoidable priority cost comes from pairs of pinned starts. A feasible
+    schedule in which each patient's auto specs run back to back from
+    arrival, with no other priority delay, meets both bounds; the makespan
+    bound then follows, since it is the latest arrival plus that duration.
+    """
+    num_patients = len(arrival_idx)
+    num_specs = len(dur_slots)
+    total_dur = sum(dur_slots)
+    spec_intervals: List[List[tuple]] = [[] for _ in range(num_specs)]
+    patient_intervals: List[List[tuple]] = [[] for _ in range(num_patients)]
+    for p, start, dur in fixed_busy:
+        patient_intervals[p].append((start, start + dur))
+
+    fixed_priority_cost = 0
+    for p in range(num_patients):
+        row = greedy[p]
+        if any(start is None for start in row):
+            return None
+        row_end = max(row[s] + dur_slots[s] for s in range(num_specs))
+        if min(row) != arrival_idx[p] or row_end != arrival_idx[p] + total_dur or row_end > horizon:
+            return None
+        pins = pin_idx_grid[p]
+        for earlier_s, later_s in priority_pairs:
+            delay = max(0, row[earlier_s] - row[later_s])
+            if pins[earlier_s] is not None and pins[later_s] is not None:
+                fixed_priority_cost += delay
+            elif delay:
+                return None
+        for s in range(num_specs):
+            interval = (row[s], row[s] + dur_slots[s])
+            patient_intervals[p].append(interval)
+            spec_intervals[s].append(interval)
+
+    for intervals in patient_intervals + spec_intervals:
+        intervals.sort()
+        if any(a[1] > b[0] for a, b in zip(intervals, intervals[1:])):
+            return None
+
+    makespan = max(arrival_idx) + total_dur
+    return (WEIGHT_SPAN * total_dur * num_patients
+            + WEIGHT_PRIORITY * fixed_priority_cost
+            + WEIGHT_MAKESPAN * makespan)
+
+
+def _result_slots(
+    patients: List[SolvePatient],
+    auto_specs: List[SolveSpecialty],
+    time_slots: List[str],
+    start_grid: List[List[int]],
+    pin_idx_grid: List[List[Optional[int]]],
+    pinned_non_auto: List[PinnedSlot],
+) -> List[SolveResultSlot]:
+    """Result slots for the auto starts in `start_grid` plus the non-auto pinned slots."""
+    result_slots: List[SolveResultSlot] = []
+    emitted = set()  # (patient_name, time_slot)
+
+    for p, patient in enumerate(patients):
+        p_name = patient.name
+        for s in range(len(auto_specs)):
+            time_str = time_slots[start_grid[p][s]]
+            emitted.add((p_name, time_str))
+            result_slots.append(SolveResultSlot.model_construct(
                 patient_name=p_name,
                 time_slot=time_str,
-                specialty_id=spec.id,
-                pinned=is_pinned,
+                specialty_id=auto_specs[s].id,
+                pinned=pin_idx_grid[p][s] is not None,
             ))
 
     # Add non-auto pinned slots
-    emitted = {(sl.patient_name, sl.time_slot) for sl in result_slots}
     for ps in pinned_non_auto:
         if (ps.patient_name, ps.time_slot) not in emitted:
-            result_slots.append(SolveResultSlot(
+            result_slots.append(SolveResultSlot.model_construct(
                 patient_name=ps.patient_name,
                 time_slot=ps.time_slot,
                 specialty_id=ps.specialty_id,
                 pinned=True,
             ))
 
-    status_str = "OPTIMAL" if status == cp_model.OPTIMAL else "FEASIBLE"
-    return SolveResponse(
-        status=status_str,
-        slots=result_slots,
-        solve_time_ms=elapsed,
-        message=f"Solved in {elapsed}ms with objective value {solver.ObjectiveValue():.0f}",
-    )
+    return result_slots
 
 
 def _pinned_slots_to_result(pinned_slots: List[PinnedSlot]) -> List[SolveResultSlot]:
     """Convert pinned slots directly to result slots (no solver needed)."""
     return [
-        SolveResultSlot(
+        SolveResultSlot.model_construct(
             patient_name=ps.patient_name,
             time_slot=ps.time_slot,
             specialty_id=ps.specialty_id,
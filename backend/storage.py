@@ -0,0 +1,214 @@
+from fastapi import Request
+from fastapi.responses import Response
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import os
+import orjson
+from pathlib import Path
+import aiofiles
+import aiofiles.os
+import aiosqlite
+
+# Data directory
+DATA_DIR = Path(__file__).parent / "data"
+DATA_DIR.mkdir(exist_ok=True)
+DB_PATH = DATA_DIR / "scheduling.db"
+
+# SQLite storage
+#
+# Each collection is a table of (id, data) rows, where data is the item's
+# JSON; rowid order is creation order. Mutations are single-row upserts and
+# deletes, so they don't rewrite the whole collection.
+#
+# Collections are also cached in memory as a dict from id to item, tagged
+# with SQLite's data_version. Reads are served from memory until another
+# connection (e.g. another worker process) commits, which bumps the version.
+#
+# `<collection>.json` in DATA_DIR is kept as a backup export. It is
+# rewritten from the database FLUSH_DELAY seconds after the last change, so
+# a burst of edits costs one write. When the database file is first
+# created, its tables are seeded from the JSON files, which imports data
+# from the earlier JSON-only storage. An existing database is never
+# reseeded: an export still holding just-deleted rows would bring them back.
+COLLECTIONS = ("specialties", "schedules")
+FLUSH_DELAY = 0.2  # seconds
+
+_db: Optional[aiosqlite.Connection] = None
+_CACHE: Dict[str, Tuple[Dict[str, dict], int]] = {}
+# Serialized GET responses and their ETags, keyed by collection; dropped
+# whenever the data changes.
+_BYTES_CACHE: Dict[str, Tuple[bytes, str]] = {}
+_LOCKS: Dict[str, asyncio.Lock] = {}
+_PENDING_TIMERS: Dict[str, asyncio.TimerHandle] = {}
+_PENDING_FLUSHES: Set[asyncio.Task] = set()
+
+def _get_lock(collection: str) -> asyncio.Lock:
+    if collection not in _LOCKS:
+        _LOCKS[collection] = asyncio.Lock()
+    return _LOCKS[collection]
+
+async def init_storage():
+    """Open the database, create missing tables and, for a new database, seed them from JSON."""
+    global _db
+    new_db = not DB_PATH.exists()
+    _db = await aiosqlite.connect(DB_PATH)
+    await _db.execute("PRAGMA journal_mode=WAL")
+    await _db.execute("PRAGMA synchronous=NORMAL")
+    for collection in COLLECTIONS:
+        await _db.execute(
+            f"CREATE TABLE IF NOT EXISTS {collection} (id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        json_path = DATA_DIR / f"{collection}.json"
+        if new_db and json_path.exists():
+            async with aiofiles.open(json_path, 'rb') as f:
+                items = orjson.loads(await f.read())
+            await _db.executemany(
+                f"INSERT OR REPLACE INTO {collection} (id, data) VALUES (?, ?)",
+                [(item["id"], orjson.dumps(item).decode()) for item in items],
+            )
+    await _db.commit()
+
+async def close_storage():
+    """Write out pending JSON exports and close the database."""
+    global _db
+    await flush_pending_writes()
+    if _db is not None:
+        await _db.close()
+        _db = None
+
+async def _data_version() -> int:
+    async with _db.execute("PRAGMA data_version") as cursor:
+        return (await cursor.fetchone())[0]
+
+async def load_data(collection: str) -> Dict[str, dict]:
+    """Return the items of `collection` by id, querying the database only if it changed.
+
+    The returned dict is shared with the cache and must not be mutated;
+    use `save_items` / `update_items` / `delete_item` instead.
+    """
+    version = await _data_version()
+    cached = _CACHE.get(collection)
+    if cached is not None and cached[1] == version:
+        return cached[0]
+
+    async with _get_lock(collection):
+        return await _load_locked(collection)
+
+async def _load_locked(collection: str) -> Dict[str, dict]:
+    """`load_data` for callers already holding the collection lock."""
+    version = await _data_version()
+    cached = _CACHE.get(collection)
+    if cached is not None and cached[1] == version:
+        return cached[0]
+    async with _db.execute(f"SELECT id, data FROM {collection} ORDER BY rowid") as cursor:
+        data = {row[0]: orjson.loads(row[1]) async for row in cursor}
+    _CACHE[collection] = (data, version)
+    _BYTES_CACHE.pop(collection, None)
+    return data
+
+async def _upsert_locked(collection: str, items: List[dict]):
+    if not items:
+        return
+    await _db.executemany(
+        f"INSERT INTO {collection} (id, data) VALUES (?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+        [(item["id"], orjson.dumps(item).decode()) for item in items],
+    )
+    await _db.commit()
+    cached = _CACHE[collection][0]
+    for item in items:
+        cached[item["id"]] = item
+    _changed(collection)
+
+async def save_items(collection: str, items: Iterable[dict]):
+    """Insert or update `items` (matched by id) in `collection`."""
+    items = list(items)
+    if not items:
+        return
+    async with _get_lock(collection):
+        await _load_locked(collection)
+        await _upsert_locked(collection, items)
+
+async def save_item(collection: str, item: dict):
+    """Insert or update one item (matched by id) in `collection`."""
+    await save_items(collection, [item])
+
+async def update_items(collection: str,
+                       update: Callable[[Dict[str, dict]], Iterable[dict]]) -> List[dict]:
+    """Upsert the items `update` builds from the current contents of `collection`.
+
+    The read and the write happen under the collection lock, so no other
+    request can change the collection in between. `update` must not mutate
+    the dict it is given; exceptions it raises abort without writing.
+    Returns the items written.
+    """
+    async with _get_lock(collection):
+        items = list(update(await _load_locked(collection)))
+        await _upsert_locked(collection, items)
+        return items
+
+async def delete_item(collection: str, item_id: str) -> bool:
+    """Delete an item by id; return whether it existed."""
+    async with _get_lock(collection):
+        await _load_locked(collection)
+        cursor = await _db.execute(f"DELETE FROM {collection} WHERE id = ?", (item_id,))
+        await _db.commit()
+        _CACHE[collection][0].pop(item_id, None)
+        if cursor.rowcount == 0:
+            return False
+        _changed(collection)
+        return True
+
+def _changed(collection: str):
+    """Drop cached response bytes and schedule a debounced JSON export."""
+    _BYTES_CACHE.pop(collection, None)
+    timer = _PENDING_TIMERS.pop(collection, None)
+    if timer is not None:
+        timer.cancel()
+    loop = asyncio.get_running_loop()
+    _PENDING_TIMERS[collection] = loop.call_later(FLUSH_DELAY, _start_flush, collection)
+
+def _start_flush(collection: str):
+    _PENDING_TIMERS.pop(collection, None)
+    task = asyncio.create_task(_flush(collection))
+    _PENDING_FLUSHES.add(task)
+    task.add_done_callback(_PENDING_FLUSHES.discard)
+
+async def _flush(collection: str):
+    async with _get_lock(collection):
+        async with _db.execute(f"SELECT data FROM {collection} ORDER BY rowid") as cursor:
+            data = [orjson.loads(row[0]) async for row in cursor]
+        # Write then rename, so exports from other worker processes can't interleave
+        json_path = DATA_DIR / f"{collection}.json"
+        tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.tmp")
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            await f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        await aiofiles.os.replace(tmp_path, json_path)
+
+def cached_json_response(request: Request, collection: str, data: Dict[str, dict],
+                         sort_key=None) -> Response:
+    """Return the items of `data` as a JSON list, reusing the bytes encoded since the last change.
+
+    Responses carry an ETag; a request whose If-None-Match matches it gets
+    an empty 304 instead of the body.
+    """
+    if collection not in _BYTES_CACHE:
+        items = list(data.values())
+        if sort_key is not None:
+            items.sort(key=sort_key)
+        body = orjson.dumps(items)
+        _BYTES_CACHE[collection] = (body, f'"{hashlib.md5(body).hexdigest()}"')
+    body, etag = _BYTES_CACHE[collection]
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def flush_pending_writes():
+    """Run any debounced JSON exports now and wait for all of them to finish."""
+    for collection in list(_PENDING_TIMERS):
+        _PENDING_TIMERS[collection].cancel()
+        _start_flush(collection)
+    if _PENDING_FLUSHES:
+        await asyncio.gather(*_PENDING_FLUSHES)